@@ -1,50 +1,97 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Depends, Query, Request, Response
+from typing import Optional, Tuple
 from sqlalchemy.orm import Session
-import json
 
-from app.db.session import SessionLocal
+from app.db.session import get_read_db, get_read_session
 from app.db import crud
+from app.core.http_cache import make_etag, is_not_modified, not_modified_response, cache_headers, ranged_file_response
+from app.schemas.weather_crud import weather_record_to_dict
 from app.services.export import ExportService
 
 router = APIRouter(prefix="/export", tags=["export"])
 export_service = ExportService()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/weather-data")
-async def export_weather_data(db: Session = Depends(get_db)):
+async def export_weather_data(
+    request: Request,
+    since: Optional[str] = Query(None, description="Cursor returned by a previous export"),
+    db: Session = Depends(get_read_db)
+):
+    if since is not None:
+        try:
+            since_at = export_service.parse_cursor(since)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return _export_weather_delta(since, since_at, db)
+    
+    cursor = export_service.next_cursor(crud.get_weather_records_high_water_mark(db))
+    records = crud.get_weather_records(db)
+    
+    etag = make_etag(records)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
     try:
-        records = crud.get_weather_records(db)
+        records_data = [weather_record_to_dict(record) for record in records]
+        export_data = export_service.export_weather_data(records_data, cursor=cursor)
         
-        if not records:
-            raise HTTPException(status_code=404, detail="No records found")
+        return Response(content=export_data, media_type="application/json", headers=cache_headers(etag))
         
-        records_data = []
-        for record in records:
-            record_dict = {
-                "id": record.id,
-                "location_id": record.location_id,
-                "start_date": record.start_date.isoformat(),
-                "end_date": record.end_date.isoformat(),
-                "weather_data": record.weather_data,
-                "created_at": record.created_at.isoformat(),
-                "location": {
-                    "id": record.location.id,
-                    "name": record.location.name,
-                    "latitude": record.location.latitude,
-                    "longitude": record.location.longitude
-                }
-            }
-            records_data.append(record_dict)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _export_weather_delta(since: str, since_at, db: Session) -> Response:
+    try:
+        cursor = export_service.next_cursor(crud.get_weather_records_high_water_mark(db), since_at)
+        records, deleted_ids = crud.get_weather_record_changes(db, since_at)
         
-        export_data = export_service.export_weather_data(records_data)
+        records_data = [weather_record_to_dict(record) for record in records]
+        export_data = export_service.export_weather_delta(records_data, deleted_ids, since, cursor)
         
-        return json.loads(export_data.decode('utf-8'))
+        return Response(content=export_data, media_type="application/json")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+def _snapshot_state(db: Session) -> Tuple[str, str]:
+    high_water_mark = crud.get_weather_records_high_water_mark(db)
+    return export_service.snapshot_version(high_water_mark), export_service.next_cursor(high_water_mark)
+
+def _load_snapshot_records(db: Session):
+    return [weather_record_to_dict(record) for record in crud.get_weather_records(db)]
+
+@router.get("/weather-data/snapshot")
+def export_weather_data_snapshot(request: Request, db: Session = Depends(get_read_db)):
+    version, cursor = _snapshot_state(db)
+    etag = f'"{version}"'
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    try:
+        path = export_service.ensure_snapshot(version, cursor, lambda: _load_snapshot_records(db))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return ranged_file_response(
+        request,
+        str(path),
+        media_type="application/gzip",
+        headers=cache_headers(etag),
+        filename=path.name
+    )
+
+def _rebuild_snapshot():
+    db = get_read_session()
+    try:
+        version, cursor = _snapshot_state(db)
+        export_service.ensure_snapshot(version, cursor, lambda: _load_snapshot_records(db))
+    finally:
+        db.close()
+
+@router.post("/weather-data/snapshot", status_code=202)
+def refresh_weather_data_snapshot(background_tasks: BackgroundTasks, db: Session = Depends(get_read_db)):
+    version, _ = _snapshot_state(db)
+    if export_service.get_snapshot(version):
+        return {"status": "ready", "version": version}
+    background_tasks.add_task(_rebuild_snapshot)
+    return {"status": "scheduled", "version": version}
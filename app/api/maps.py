@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import List
+from fastapi.responses import FileResponse
+from app.core.http_cache import is_not_modified, not_modified_response, cache_headers
 from app.services.maps import MapsService
 
 router = APIRouter(prefix="/maps", tags=["maps"])
 maps_service = MapsService()
 
+STATIC_MAP_CACHE_CONTROL = "public, max-age=604800, immutable"
+
 @router.get("/location-details")
 async def get_location_details(location: str = Query(...)):
     try:
@@ -12,22 +17,59 @@ async def get_location_details(location: str = Query(...)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/location-details/batch")
+async def get_location_details_batch(locations: List[str] = Query(..., max_length=500)):
+    try:
+        return await maps_service.get_location_details_batch(locations)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/static-map")
 async def get_static_map(
-    latitude: float = Query(...),
-    longitude: float = Query(...),
+    request: Request,
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    zoom: int = Query(10, ge=1, le=20),
+    size: str = Query("400x400"),
+    map_type: str = Query("roadmap")
+):
+    try:
+        maps_service.static_map_key(latitude, longitude, zoom, size, map_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    map_url = request.url_for("get_static_map_image").include_query_params(
+        latitude=latitude, longitude=longitude, zoom=zoom, size=size, map_type=map_type
+    )
+    return {
+        "map_url": str(map_url),
+        "coordinates": {"latitude": latitude, "longitude": longitude},
+        "zoom": zoom,
+        "size": size,
+        "map_type": map_type
+    }
+
+@router.get("/static-map/image")
+async def get_static_map_image(
+    request: Request,
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
     zoom: int = Query(10, ge=1, le=20),
     size: str = Query("400x400"),
     map_type: str = Query("roadmap")
 ):
     try:
-        map_url = maps_service.get_static_map_url(latitude, longitude, zoom, size, map_type)
-        return {
-            "map_url": map_url,
-            "coordinates": {"latitude": latitude, "longitude": longitude},
-            "zoom": zoom,
-            "size": size,
-            "map_type": map_type
-        }
+        key = maps_service.static_map_key(latitude, longitude, zoom, size, map_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    etag = f'"{key}"'
+    if is_not_modified(request, etag):
+        return not_modified_response(etag, cache_control=STATIC_MAP_CACHE_CONTROL)
+    
+    try:
+        path = await maps_service.get_static_map_image(latitude, longitude, zoom, size, map_type)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    
+    return FileResponse(path, media_type="image/png", headers=cache_headers(etag, cache_control=STATIC_MAP_CACHE_CONTROL))
@@ -1,17 +1,40 @@
-from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi import APIRouter, HTTPException, Query, Path, Depends, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.orm import Session
 from typing import Optional, List, Dict
+from datetime import datetime, timedelta, timezone
+import asyncio
+import logging
+import orjson
+
+from app.db.session import get_db, get_read_db
+from app.db import crud
 from app.services.weather import WeatherService
+from app.services.geocoding import normalize_location
+from app.services.observations import observation_service
+from app.services.live import live_weather_hub
 
 router = APIRouter(prefix="/weather", tags=["weather"])
 weather_service = WeatherService()
+logger = logging.getLogger(__name__)
+
+STREAM_KEEPALIVE_SECONDS = 15
+
+def _record_observation(db: Session, location: str, weather_data: Dict):
+    try:
+        observation_service.record_current_weather(db, location, weather_data)
+    except Exception as e:
+        db.rollback()
+        logger.warning("Could not record observation for %s: %s", location, e)
 
 @router.get("/current")
-async def get_current_weather(location: str = Query(...)):
+async def get_current_weather(location: str = Query(...), db: Session = Depends(get_db)):
     try:
         weather_data = await weather_service.get_current_weather(location)
-        return weather_data
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    _record_observation(db, location, weather_data)
+    return weather_data
 
 @router.get("/forecast")
 async def get_5day_forecast(location: str = Query(...)):
@@ -22,12 +45,58 @@ async def get_5day_forecast(location: str = Query(...)):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/summary")
-async def get_weather_summary(location: str = Query(...)):
+async def get_weather_summary(location: str = Query(...), db: Session = Depends(get_db)):
     try:
         summary_data = await weather_service.get_weather_summary(location)
-        return summary_data
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+    _record_observation(db, location, summary_data)
+    return summary_data
+
+@router.get("/stream")
+async def stream_weather(request: Request, location: str = Query(..., min_length=1)):
+    async def events():
+        key, queue = live_weather_hub.subscribe(location)
+        try:
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=STREAM_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['event']}\ndata: {orjson.dumps(event['data']).decode('utf-8')}\n\n"
+        finally:
+            live_weather_hub.unsubscribe(key, queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/history")
+async def get_weather_history(
+    location: List[str] = Query(..., max_length=1000),
+    days: int = Query(90, ge=1, le=3650),
+    resolution: str = Query("day", pattern="^(hour|day)$"),
+    db: Session = Depends(get_read_db)
+):
+    keys = {name: normalize_location(name) for name in location}
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    
+    series = {key: [] for key in keys.values()}
+    for rollup in crud.get_weather_rollups(db, list(series), resolution, since):
+        series[rollup.location_key].append({
+            "bucket_start": rollup.bucket_start,
+            "samples": rollup.sample_count,
+            "temperature": {"min": rollup.temperature_min, "max": rollup.temperature_max, "avg": rollup.temperature_avg},
+            "humidity": rollup.humidity_avg,
+            "pressure": rollup.pressure_avg,
+            "wind_speed": {"avg": rollup.wind_speed_avg, "max": rollup.wind_speed_max}
+        })
+    
+    history = {name: series[key] for name, key in keys.items()}
+    return ORJSONResponse({"resolution": resolution, "days": days, "history": history})
 
 @router.get("/validate")
 async def validate_location(location: str = Query(...)):
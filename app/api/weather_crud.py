@@ -1,53 +1,80 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.exc import StaleDataError
 from typing import List, Optional
 from datetime import date, datetime, timedelta
 import json
 
-from app.db.session import SessionLocal
+from app.db.session import get_db, get_read_db
 from app.db import crud
+from app.core.http_cache import make_etag, last_modified, is_not_modified, not_modified_response, cache_headers
 from app.schemas.weather_crud import (
     WeatherRecordCreate, 
     WeatherRecordUpdate, 
     WeatherRecordResponse,
     WeatherRecordListResponse,
     WeatherDataRequest,
-    WeatherDataResponse
+    WeatherDataResponse,
+    WeatherJobResponse,
+    WeatherJobAcceptedResponse,
+    weather_record_to_dict,
+    weather_job_to_dict
 )
 from app.services.weather import WeatherService
+from app.services.jobs import weather_job_worker, get_or_create_location, resolve_location
 
 router = APIRouter(prefix="/weather-data", tags=["weather-data"])
 weather_service = WeatherService()
 
-def get_db():
-    db = SessionLocal()
+def _conditional_response(request: Request, records, content_builder, modified=None):
+    etag = make_etag(records)
+    if is_not_modified(request, etag, modified):
+        return not_modified_response(etag, modified)
+    return ORJSONResponse(content_builder(), headers=cache_headers(etag, modified))
+
+def _conditional_list(request: Request, records):
+    return _conditional_response(request, records, lambda: [weather_record_to_dict(record) for record in records])
+
+JOB_ACCEPTED_RESPONSES = {
+    202: {"model": WeatherJobAcceptedResponse, "description": "Stored as pending; weather is fetched in the background (async_mode=true)"}
+}
+
+def _update_record(db: Session, record_id: int, update_dict: dict):
     try:
-        yield db
-    finally:
-        db.close()
+        return crud.update_weather_record(db, record_id, update_dict)
+    except StaleDataError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Record was modified by another request, please retry")
 
-@router.post("/create", response_model=WeatherRecordResponse)
+def _job_accepted(job, record) -> ORJSONResponse:
+    return ORJSONResponse(
+        {"job": weather_job_to_dict(job), "record": weather_record_to_dict(record)},
+        status_code=202,
+        headers={"Location": f"/weather-data/jobs/{job.id}"}
+    )
+
+@router.post("/create", response_model=WeatherRecordResponse, responses=JOB_ACCEPTED_RESPONSES)
 async def create_weather_record(
     request: WeatherDataRequest,
+    async_mode: bool = Query(False, description="Insert immediately and enrich in the background"),
     db: Session = Depends(get_db)
 ):
     try:
-        coordinates = await weather_service.get_coordinates_from_location(request.location)
-        lat, lon = coordinates
-        
-        location_data = {
-            "name": request.location,
-            "latitude": str(lat),
-            "longitude": str(lon)
-        }
-        
-        existing_location = crud.get_location_by_name(db, request.location)
-        if existing_location:
-            location_id = existing_location.id
-        else:
-            location = crud.create_location(db, location_data)
-            location_id = location.id
+        if async_mode:
+            location_id = get_or_create_location(db, request.location)
+            record = crud.create_weather_record(db, {
+                "location_id": location_id,
+                "start_date": request.start_date,
+                "end_date": request.end_date,
+                "weather_data": None,
+                "status": "pending"
+            })
+            job = crud.create_weather_job(db, record.id)
+            weather_job_worker.notify()
+            return _job_accepted(job, record)
         
+        location_id = await resolve_location(db, weather_service, request.location)
         weather_data = await weather_service.get_weather_summary(request.location)
         
         record_data = {
@@ -65,37 +92,52 @@ async def create_weather_record(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/jobs/{job_id}", response_model=WeatherJobResponse)
+async def get_weather_job(
+    job_id: int,
+    db: Session = Depends(get_read_db)
+):
+    job = crud.get_weather_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return WeatherJobResponse.from_orm(job)
+
 @router.get("/", response_model=List[WeatherRecordListResponse])
 async def get_all_weather_records(
+    request: Request,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    records = db.query(crud.WeatherRecord).offset(skip).limit(limit).all()
-    return [WeatherRecordListResponse.from_orm(record) for record in records]
+    records = db.query(crud.WeatherRecord).options(joinedload(crud.WeatherRecord.location)).offset(skip).limit(limit).all()
+    return _conditional_list(request, records)
 
 @router.get("/{record_id}", response_model=WeatherRecordResponse)
 async def get_weather_record(
     record_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     record = crud.get_weather_record(db, record_id)
     if not record:
         raise HTTPException(status_code=404, detail="Record not found")
-    return WeatherRecordResponse.from_orm(record)
+    
+    return _conditional_response(request, [record], lambda: weather_record_to_dict(record), last_modified([record]))
 
 @router.get("/location/{location_id}", response_model=List[WeatherRecordListResponse])
 async def get_weather_records_by_location(
     location_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: Session = Depends(get_read_db)
 ):
     records = crud.get_weather_records_by_location(db, location_id)
-    return [WeatherRecordListResponse.from_orm(record) for record in records]
+    return _conditional_list(request, records)
 
-@router.put("/{record_id}", response_model=WeatherRecordResponse)
+@router.put("/{record_id}", response_model=WeatherRecordResponse, responses=JOB_ACCEPTED_RESPONSES)
 async def update_weather_record(
     record_id: int,
     update_data: WeatherRecordUpdate,
+    async_mode: bool = Query(False, description="Apply immediately and refetch weather in the background"),
     db: Session = Depends(get_db)
 ):
     existing_record = crud.get_weather_record(db, record_id)
@@ -103,49 +145,38 @@ async def update_weather_record(
         raise HTTPException(status_code=404, detail="Record not found")
     
     update_dict = update_data.dict(exclude_unset=True)
+    location_name = update_dict.pop('location', None)
     
-    if update_dict.get('location'):
+    if location_name:
         try:
-            coordinates = await weather_service.get_coordinates_from_location(update_dict['location'])
-            lat, lon = coordinates
-            
-            location_data = {
-                "name": update_dict['location'],
-                "latitude": str(lat),
-                "longitude": str(lon)
-            }
-            
-            existing_location = crud.get_location_by_name(db, update_dict['location'])
-            if existing_location:
-                location_id = existing_location.id
+            if async_mode:
+                update_dict['location_id'] = get_or_create_location(db, location_name)
             else:
-                location = crud.create_location(db, location_data)
-                location_id = location.id
-            
-            update_dict['location_id'] = location_id
-            del update_dict['location']
-            
+                update_dict['location_id'] = await resolve_location(db, weather_service, location_name)
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
     
-    if update_dict.get('weather_data') is None and (update_dict.get('location_id') or update_dict.get('start_date') or update_dict.get('end_date')):
+    location_changed = update_dict.get('location_id') is not None and update_dict['location_id'] != existing_record.location_id
+    refresh_weather = update_dict.get('weather_data') is None and location_changed
+    
+    if refresh_weather and async_mode:
+        update_dict['status'] = "pending"
+        updated_record = _update_record(db, record_id, update_dict)
+        job = crud.create_weather_job(db, record_id)
+        weather_job_worker.notify()
+        return _job_accepted(job, updated_record)
+    
+    if refresh_weather:
         try:
-            location_name = existing_record.location.name
-            if update_dict.get('location_id'):
-                new_location = crud.get_location(db, update_dict['location_id'])
-                if new_location:
-                    location_name = new_location.name
-            
-            start_date = update_dict.get('start_date', existing_record.start_date)
-            end_date = update_dict.get('end_date', existing_record.end_date)
-            
-            weather_data = await weather_service.get_weather_summary(location_name)
-            update_dict['weather_data'] = weather_data
-            
+            new_location = crud.get_location(db, update_dict['location_id'])
+            update_dict['weather_data'] = await weather_service.get_weather_summary(new_location.name)
         except Exception as e:
             raise HTTPException(status_code=400, detail=str(e))
     
-    updated_record = crud.update_weather_record(db, record_id, update_dict)
+    if update_dict.get('weather_data') is not None:
+        update_dict['status'] = "ready"
+    
+    updated_record = _update_record(db, record_id, update_dict)
     if not updated_record:
         raise HTTPException(status_code=404, detail="Record not found")
     
@@ -163,8 +194,9 @@ async def delete_weather_record(
 
 @router.get("/search/location", response_model=List[WeatherRecordListResponse])
 async def search_weather_records_by_location_name(
+    request: Request,
     location_name: str = Query(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     locations = db.query(crud.Location).filter(crud.Location.name.ilike(f"%{location_name}%")).all()
     if not locations:
@@ -175,20 +207,21 @@ async def search_weather_records_by_location_name(
         records = crud.get_weather_records_by_location(db, location.id)
         all_records.extend(records)
     
-    return [WeatherRecordListResponse.from_orm(record) for record in all_records]
+    return _conditional_list(request, all_records)
 
 @router.get("/search/date-range", response_model=List[WeatherRecordListResponse])
 async def search_weather_records_by_date_range(
+    request: Request,
     start_date: date = Query(...),
     end_date: date = Query(...),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     if end_date <= start_date:
         raise HTTPException(status_code=400, detail="End date must be after start date")
     
-    records = db.query(crud.WeatherRecord).filter(
+    records = db.query(crud.WeatherRecord).options(joinedload(crud.WeatherRecord.location)).filter(
         crud.WeatherRecord.start_date <= end_date,
         crud.WeatherRecord.end_date >= start_date
     ).all()
     
-    return [WeatherRecordListResponse.from_orm(record) for record in records]
+    return _conditional_list(request, records)
@@ -5,5 +5,26 @@ load_dotenv()
 
 class Setting:
     DATABASE_URL = os.getenv("DATABASE_URL")
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+    EXPORT_SNAPSHOT_DIR = os.getenv("EXPORT_SNAPSHOT_DIR", "export_snapshots")
+    EXPORT_SNAPSHOT_KEEP = int(os.getenv("EXPORT_SNAPSHOT_KEEP", "2"))
+    MAP_CACHE_DIR = os.getenv("MAP_CACHE_DIR", "map_cache")
+    MAP_CACHE_MAX_BYTES = int(os.getenv("MAP_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "10000"))
+    GEOCODE_BATCH_CONCURRENCY = int(os.getenv("GEOCODE_BATCH_CONCURRENCY", "8"))
+    GEOCODE_NOT_FOUND_TTL_SECONDS = float(os.getenv("GEOCODE_NOT_FOUND_TTL_SECONDS", "300"))
+    WEATHER_JOB_WORKERS = int(os.getenv("WEATHER_JOB_WORKERS", "4"))
+    WEATHER_JOB_POLL_SECONDS = float(os.getenv("WEATHER_JOB_POLL_SECONDS", "2"))
+    WEATHER_JOB_MAX_ATTEMPTS = int(os.getenv("WEATHER_JOB_MAX_ATTEMPTS", "3"))
+    WEATHER_JOB_LEASE_SECONDS = int(os.getenv("WEATHER_JOB_LEASE_SECONDS", "300"))
+    OBSERVATION_ROLLUP_SECONDS = float(os.getenv("OBSERVATION_ROLLUP_SECONDS", "300"))
+    OBSERVATION_RAW_RETENTION_DAYS = int(os.getenv("OBSERVATION_RAW_RETENTION_DAYS", "7"))
+    OBSERVATION_HOURLY_RETENTION_DAYS = int(os.getenv("OBSERVATION_HOURLY_RETENTION_DAYS", "90"))
+    LIVE_WEATHER_POLL_SECONDS = float(os.getenv("LIVE_WEATHER_POLL_SECONDS", "60"))
+    LIVE_WEATHER_QUEUE_SIZE = int(os.getenv("LIVE_WEATHER_QUEUE_SIZE", "16"))
+    WEATHER_DATA_COMPRESSION = os.getenv("WEATHER_DATA_COMPRESSION", "none")
+    WEATHER_DATA_COMPRESSION_LEVEL = int(os.getenv("WEATHER_DATA_COMPRESSION_LEVEL", "6"))
+    WEATHER_DATA_DICTIONARY_PATH = os.getenv("WEATHER_DATA_DICTIONARY_PATH")
 
 settings = Setting()
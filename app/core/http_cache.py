@@ -0,0 +1,107 @@
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+
+RANGE_CHUNK_SIZE = 64 * 1024
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def record_modified(record) -> Optional[datetime]:
+    modified = getattr(record, "updated_at", None) or getattr(record, "created_at", None)
+    return _as_utc(modified) if modified else None
+
+def make_etag(records: Iterable) -> str:
+    digest = hashlib.sha1()
+    for record in records:
+        modified = record_modified(record)
+        stamp = modified.isoformat() if modified else ""
+        digest.update(f"{record.id}:{getattr(record, 'version', '')}:{stamp};".encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+def last_modified(records: Iterable) -> Optional[datetime]:
+    stamps = [m for m in (record_modified(record) for record in records) if m]
+    return max(stamps) if stamps else None
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def is_not_modified(request: Request, etag: str, modified: Optional[datetime] = None) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [_opaque_tag(tag) for tag in if_none_match.split(",")]
+        return "*" in tags or _opaque_tag(etag) in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modified:
+        try:
+            since = _as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False
+        return modified.replace(microsecond=0) <= since
+    return False
+
+def cache_headers(etag: str, modified: Optional[datetime] = None, cache_control: str = "no-cache") -> dict:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if modified:
+        headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+    return headers
+
+def not_modified_response(etag: str, modified: Optional[datetime] = None, cache_control: str = "no-cache") -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, modified, cache_control))
+
+def _parse_range(range_header: str, size: int) -> Optional[Tuple[int, int]]:
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    if not first:
+        length = int(last)
+        if length <= 0:
+            raise ValueError("Unsatisfiable range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("Unsatisfiable range")
+    return start, min(end, size - 1)
+
+def _iter_file_range(path: str, start: int, end: int):
+    with open(path, "rb") as file:
+        file.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = file.read(min(RANGE_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def ranged_file_response(request: Request, path: str, media_type: str, headers: dict, filename: Optional[str] = None) -> Response:
+    size = os.stat(path).st_size
+    headers = {**headers, "Accept-Ranges": "bytes"}
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == headers.get("ETag")):
+        try:
+            byte_range = _parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        if byte_range:
+            start, end = byte_range
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+            headers["Content-Length"] = str(end - start + 1)
+            return StreamingResponse(_iter_file_range(path, start, end), status_code=206, media_type=media_type, headers=headers)
+
+    return FileResponse(path, media_type=media_type, headers=headers)
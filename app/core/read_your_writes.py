@@ -0,0 +1,31 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.db.session import STICKY_PRIMARY_COOKIE, has_replicas
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+class ReadYourWritesMiddleware:
+
+    def __init__(self, app: ASGIApp, sticky_seconds: int = 5):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS or not has_replicas():
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = time.time() + self.sticky_seconds
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "set-cookie",
+                    f"{STICKY_PRIMARY_COOKIE}={until:.3f}; Max-Age={self.sticky_seconds}; Path=/; HttpOnly; SameSite=Lax"
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
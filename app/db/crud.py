@@ -1,5 +1,14 @@
-from app.db.models import WeatherRecord, Location
-from sqlalchemy.orm import Session
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from app.db.models import WeatherRecord, WeatherRecordTombstone, WeatherJob, WeatherObservation, WeatherRollup, Location, utcnow
+from sqlalchemy import func, or_, and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
 
 def create_location(db: Session, location_data: dict):
     db_location = Location(**location_data)
@@ -42,10 +51,10 @@ def create_weather_record(db: Session, record_data: dict):
     return db_record
 
 def get_weather_records(db: Session):
-    return db.query(WeatherRecord).all()
+    return db.query(WeatherRecord).options(joinedload(WeatherRecord.location)).all()
 
 def get_weather_records_by_location(db: Session, location_id: int):
-    return db.query(WeatherRecord).filter(WeatherRecord.location_id == location_id).all()
+    return db.query(WeatherRecord).options(joinedload(WeatherRecord.location)).filter(WeatherRecord.location_id == location_id).all()
 
 def get_weather_record(db: Session, record_id: int):
     return db.query(WeatherRecord).filter(WeatherRecord.id == record_id).first()
@@ -62,7 +71,143 @@ def update_weather_record(db: Session, record_id: int, record_data: dict):
 def delete_weather_record(db: Session, record_id: int):
     db_record = db.query(WeatherRecord).filter(WeatherRecord.id == record_id).first()
     if db_record:
+        db.add(WeatherRecordTombstone(record_id=db_record.id, location_id=db_record.location_id))
         db.delete(db_record)
         db.commit()
     return db_record
-    
\ No newline at end of file
+
+def release_unresolved_location(db: Session, record_id: int):
+    db_record = db.query(WeatherRecord).filter(WeatherRecord.id == record_id).first()
+    if not db_record or db_record.location is None or db_record.location.latitude is not None:
+        return None
+    location = db_record.location
+    db_record.location_id = None
+    db.flush()
+    if not db.query(WeatherRecord.id).filter(WeatherRecord.location_id == location.id).first():
+        db.delete(location)
+    db.commit()
+    return location
+
+def get_weather_record_changes(db: Session, since: datetime) -> Tuple[List[WeatherRecord], List[int]]:
+    records = db.query(WeatherRecord).options(joinedload(WeatherRecord.location)).filter(
+        WeatherRecord.updated_at > since
+    ).order_by(WeatherRecord.updated_at, WeatherRecord.id).all()
+    
+    deleted = db.query(WeatherRecordTombstone.record_id).filter(
+        WeatherRecordTombstone.deleted_at > since
+    ).distinct().all()
+    deleted_ids = [row.record_id for row in deleted]
+    
+    if deleted_ids:
+        live_ids = {row.id for row in db.query(WeatherRecord.id).filter(WeatherRecord.id.in_(deleted_ids)).all()}
+        deleted_ids = [record_id for record_id in deleted_ids if record_id not in live_ids]
+    
+    return records, sorted(deleted_ids)
+
+def get_weather_records_high_water_mark(db: Session) -> Tuple[Optional[datetime], Optional[datetime]]:
+    last_update = db.query(func.max(WeatherRecord.updated_at)).scalar()
+    last_delete = db.query(func.max(WeatherRecordTombstone.deleted_at)).scalar()
+    return last_update, last_delete
+
+
+def create_weather_job(db: Session, record_id: int, refresh_weather: bool = True):
+    db_job = WeatherJob(record_id=record_id, refresh_weather=refresh_weather)
+    db.add(db_job)
+    db.commit()
+    db.refresh(db_job)
+    return db_job
+
+def get_weather_job(db: Session, job_id: int):
+    return db.query(WeatherJob).filter(WeatherJob.id == job_id).first()
+
+def claim_weather_job(db: Session, lease_seconds: int) -> Optional[WeatherJob]:
+    now = utcnow()
+    claimable = or_(
+        and_(WeatherJob.status == "pending", WeatherJob.available_at <= now),
+        and_(WeatherJob.status == "running", WeatherJob.updated_at < now - timedelta(seconds=lease_seconds))
+    )
+    while True:
+        db_job = db.query(WeatherJob).filter(claimable).order_by(WeatherJob.id).first()
+        if not db_job:
+            return None
+        claimed = db.query(WeatherJob).filter(WeatherJob.id == db_job.id, claimable).update(
+            {"status": "running", "attempts": WeatherJob.attempts + 1, "updated_at": now},
+            synchronize_session=False
+        )
+        db.commit()
+        if claimed:
+            db.refresh(db_job)
+            return db_job
+
+def finish_weather_job(db: Session, job_id: int, status: str, error: Optional[str] = None, retry_in: Optional[float] = None):
+    db_job = get_weather_job(db, job_id)
+    if db_job:
+        db_job.status = status
+        db_job.error = error
+        if retry_in is not None:
+            db_job.available_at = utcnow() + timedelta(seconds=retry_in)
+        db.commit()
+        db.refresh(db_job)
+    return db_job
+
+
+def create_weather_observation(db: Session, observation_data: dict):
+    exists = db.query(WeatherObservation.id).filter(
+        WeatherObservation.location_key == observation_data["location_key"],
+        WeatherObservation.observed_at == observation_data["observed_at"]
+    ).first()
+    if exists:
+        return None
+    db_observation = WeatherObservation(**observation_data)
+    db.add(db_observation)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    return db_observation
+
+def get_weather_observations_since(db: Session, since: datetime):
+    return db.query(WeatherObservation).filter(WeatherObservation.observed_at >= since).order_by(
+        WeatherObservation.location_key, WeatherObservation.observed_at
+    ).all()
+
+def upsert_weather_rollups(db: Session, rollups: List[dict]):
+    if not rollups:
+        return
+    existing = {
+        (row.location_key, row.resolution, _as_utc(row.bucket_start)): row.id
+        for row in db.query(WeatherRollup.id, WeatherRollup.location_key, WeatherRollup.resolution, WeatherRollup.bucket_start).filter(
+            WeatherRollup.bucket_start >= min(rollup["bucket_start"] for rollup in rollups)
+        )
+    }
+    updates, inserts = [], []
+    for rollup_data in rollups:
+        rollup_id = existing.get((rollup_data["location_key"], rollup_data["resolution"], _as_utc(rollup_data["bucket_start"])))
+        if rollup_id:
+            updates.append({**rollup_data, "id": rollup_id})
+        else:
+            inserts.append(rollup_data)
+    db.bulk_update_mappings(WeatherRollup, updates)
+    db.bulk_insert_mappings(WeatherRollup, inserts)
+    db.commit()
+
+def get_weather_rollups(db: Session, location_keys: List[str], resolution: str, since: datetime):
+    return db.query(WeatherRollup).filter(
+        WeatherRollup.location_key.in_(location_keys),
+        WeatherRollup.resolution == resolution,
+        WeatherRollup.bucket_start >= since
+    ).order_by(WeatherRollup.location_key, WeatherRollup.bucket_start).all()
+
+def delete_weather_observations_before(db: Session, before: datetime) -> int:
+    deleted = db.query(WeatherObservation).filter(WeatherObservation.observed_at < before).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+def delete_weather_rollups_before(db: Session, resolution: str, before: datetime) -> int:
+    deleted = db.query(WeatherRollup).filter(
+        WeatherRollup.resolution == resolution,
+        WeatherRollup.bucket_start < before
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
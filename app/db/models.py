@@ -1,6 +1,29 @@
-from sqlalchemy import Column, Integer, String, JSON, DateTime, Date, func, ForeignKey
+from datetime import datetime, timezone
+from sqlalchemy import Column, Integer, SmallInteger, Float, String, DateTime, Date, Boolean, Text, func, ForeignKey, UniqueConstraint
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql.functions import FunctionElement
 from app.db.base import Base
+from app.db.types import weather_data_type
+
+def utcnow():
+    return datetime.now(timezone.utc)
+
+class db_now(FunctionElement):
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+@compiles(db_now)
+def _db_now(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+@compiles(db_now, "postgresql")
+def _db_now_postgresql(element, compiler, **kw):
+    return "clock_timestamp()"
+
+@compiles(db_now, "sqlite")
+def _db_now_sqlite(element, compiler, **kw):
+    return "strftime('%Y-%m-%d %H:%M:%f', 'now')"
 
 class Location(Base):
     __tablename__ = "locations"
@@ -19,7 +42,67 @@ class WeatherRecord(Base):
     location_id = Column(Integer, ForeignKey("locations.id"))
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
-    weather_data = Column(JSON)
+    weather_data = Column(weather_data_type())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=db_now(), onupdate=db_now(), server_default=func.now(), index=True)
+    version = Column(Integer, nullable=False, default=1)
+    status = Column(String, nullable=False, default="ready", server_default="ready")
 
     location = relationship("Location", back_populates="weather_records")
+
+    __mapper_args__ = {"version_id_col": version}
+
+class WeatherRecordTombstone(Base):
+    __tablename__ = "weather_record_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    record_id = Column(Integer, nullable=False, index=True)
+    location_id = Column(Integer, nullable=True)
+    deleted_at = Column(DateTime(timezone=True), default=db_now(), server_default=func.now(), index=True)
+
+class WeatherJob(Base):
+    __tablename__ = "weather_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    record_id = Column(Integer, ForeignKey("weather_records.id", ondelete="CASCADE"), nullable=False, index=True)
+    status = Column(String, nullable=False, default="pending", index=True)
+    refresh_weather = Column(Boolean, nullable=False, default=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    available_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), index=True)
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=utcnow, onupdate=utcnow, server_default=func.now())
+
+class WeatherObservation(Base):
+    __tablename__ = "weather_observations"
+    __table_args__ = (UniqueConstraint("location_key", "observed_at", name="uq_weather_observation"),)
+
+    id = Column(Integer, primary_key=True)
+    location_key = Column(String(255), nullable=False)
+    observed_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    temperature = Column(Float)
+    feels_like = Column(Float)
+    humidity = Column(SmallInteger)
+    pressure = Column(SmallInteger)
+    wind_speed = Column(Float)
+    wind_direction = Column(SmallInteger)
+    clouds = Column(SmallInteger)
+    visibility = Column(Float)
+    condition = Column(String(32))
+
+class WeatherRollup(Base):
+    __tablename__ = "weather_rollups"
+    __table_args__ = (UniqueConstraint("location_key", "resolution", "bucket_start", name="uq_weather_rollup"),)
+
+    id = Column(Integer, primary_key=True)
+    location_key = Column(String(255), nullable=False)
+    resolution = Column(String(8), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False, index=True)
+    sample_count = Column(Integer, nullable=False)
+    temperature_min = Column(Float)
+    temperature_max = Column(Float)
+    temperature_avg = Column(Float)
+    humidity_avg = Column(Float)
+    pressure_avg = Column(Float)
+    wind_speed_avg = Column(Float)
+    wind_speed_max = Column(Float)
@@ -1,6 +1,47 @@
+import itertools
+import threading
+import time
+from fastapi import Request
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
 
+STICKY_PRIMARY_COOKIE = "db_primary_until"
+
 engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+replica_engines = [create_engine(url) for url in settings.DATABASE_REPLICA_URLS]
+ReplicaSessions = [sessionmaker(autocommit=False, autoflush=False, bind=replica) for replica in replica_engines]
+_replica_cycle = itertools.cycle(ReplicaSessions)
+_replica_lock = threading.Lock()
+
+def has_replicas() -> bool:
+    return bool(ReplicaSessions)
+
+def get_read_session() -> Session:
+    if not ReplicaSessions:
+        return SessionLocal()
+    with _replica_lock:
+        session_factory = next(_replica_cycle)
+    return session_factory()
+
+def prefers_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(STICKY_PRIMARY_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db(request: Request):
+    db = SessionLocal() if prefers_primary(request) else get_read_session()
+    try:
+        yield db
+    finally:
+        db.close()
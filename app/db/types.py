@@ -0,0 +1,131 @@
+import threading
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+import orjson
+from sqlalchemy import JSON, LargeBinary
+from sqlalchemy.types import TypeDecorator
+
+from app.core.config import settings
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODECS = ("none", "zlib", "zstd")
+
+RAW_JSON = b"J"
+ZLIB = b"Z"
+ZLIB_DICT = b"D"
+ZSTD = b"S"
+ZSTD_DICT = b"T"
+
+_zstd_local = threading.local()
+
+@lru_cache(maxsize=8)
+def _dictionary_id(dictionary: bytes) -> bytes:
+    return zlib.crc32(dictionary).to_bytes(4, "big")
+
+@lru_cache(maxsize=8)
+def _zstd_dictionary(dictionary: bytes):
+    return zstandard.ZstdCompressionDict(dictionary)
+
+def _zstd_codec(kind: str, level: int, dictionary: Optional[bytes]):
+    cache = getattr(_zstd_local, "codecs", None)
+    if cache is None:
+        cache = _zstd_local.codecs = {}
+    key = (kind, level, dictionary)
+    codec = cache.get(key)
+    if codec is None:
+        dict_data = _zstd_dictionary(dictionary) if dictionary else None
+        if kind == "compress":
+            codec = zstandard.ZstdCompressor(level=level, dict_data=dict_data)
+        else:
+            codec = zstandard.ZstdDecompressor(dict_data=dict_data)
+        cache[key] = codec
+    return codec
+
+def encode_payload(raw: bytes, codec: str = "zlib", level: int = 6, dictionary: Optional[bytes] = None) -> bytes:
+    if codec == "zlib":
+        if dictionary:
+            compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS, zdict=dictionary)
+            return ZLIB_DICT + _dictionary_id(dictionary) + compressor.compress(raw) + compressor.flush()
+        return ZLIB + zlib.compress(raw, level)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd compression requires the 'zstandard' package")
+        compressed = _zstd_codec("compress", level, dictionary).compress(raw)
+        if dictionary:
+            return ZSTD_DICT + _dictionary_id(dictionary) + compressed
+        return ZSTD + compressed
+    return RAW_JSON + raw
+
+def decode_payload(payload: bytes, dictionary: Optional[bytes] = None) -> bytes:
+    payload = bytes(payload)
+    marker, body = payload[:1], payload[1:]
+
+    if marker in (ZLIB_DICT, ZSTD_DICT):
+        if not dictionary or body[:4] != _dictionary_id(dictionary):
+            raise ValueError("weather_data was compressed with a different dictionary")
+        body = body[4:]
+
+    if marker == RAW_JSON:
+        return body
+    if marker == ZLIB:
+        return zlib.decompress(body)
+    if marker == ZLIB_DICT:
+        decompressor = zlib.decompressobj(zdict=dictionary)
+        return decompressor.decompress(body) + decompressor.flush()
+    if marker in (ZSTD, ZSTD_DICT):
+        if zstandard is None:
+            raise RuntimeError("zstd decompression requires the 'zstandard' package")
+        return _zstd_codec("decompress", 0, dictionary if marker == ZSTD_DICT else None).decompress(body)
+    raise ValueError(f"Unknown weather_data storage marker {marker!r}")
+
+def build_dictionary(samples: Iterable[Any], codec: str = "zlib", size: int = 32 * 1024) -> bytes:
+    encoded = [orjson.dumps(sample) for sample in samples]
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstd dictionaries require the 'zstandard' package")
+        return zstandard.train_dictionary(size, encoded).as_bytes()
+    return b"".join(encoded)[-size:]
+
+def load_dictionary(path: Optional[str]) -> Optional[bytes]:
+    if not path:
+        return None
+    return Path(path).read_bytes()
+
+class CompressedJSON(TypeDecorator):
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, codec: str = "zlib", level: int = 6, dictionary: Optional[bytes] = None):
+        super().__init__()
+        if codec not in CODECS:
+            raise ValueError(f"Unknown codec '{codec}', expected one of {CODECS}")
+        self.codec = codec
+        self.level = level
+        self.dictionary = dictionary
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return encode_payload(orjson.dumps(value), self.codec, self.level, self.dictionary)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return orjson.loads(decode_payload(value, self.dictionary))
+
+def weather_data_type():
+    codec = settings.WEATHER_DATA_COMPRESSION
+    if codec == "none":
+        return JSON
+    return CompressedJSON(
+        codec=codec,
+        level=settings.WEATHER_DATA_COMPRESSION_LEVEL,
+        dictionary=load_dictionary(settings.WEATHER_DATA_DICTIONARY_PATH)
+    )
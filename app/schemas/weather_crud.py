@@ -37,24 +37,28 @@ class LocationResponse(BaseModel):
 
 class WeatherRecordResponse(BaseModel):
     id: int
-    location_id: int
+    location_id: Optional[int]
     start_date: date
     end_date: date
     weather_data: Optional[Dict[str, Any]]
     created_at: datetime
-    location: LocationResponse
+    updated_at: Optional[datetime] = None
+    status: str = "ready"
+    location: Optional[LocationResponse]
     
     class Config:
         from_attributes = True
 
 class WeatherRecordListResponse(BaseModel):
     id: int
-    location_id: int
+    location_id: Optional[int]
     start_date: date
     end_date: date
     weather_data: Optional[Dict[str, Any]]
     created_at: datetime
-    location: LocationResponse
+    updated_at: Optional[datetime] = None
+    status: str = "ready"
+    location: Optional[LocationResponse]
     
     class Config:
         from_attributes = True
@@ -85,3 +89,53 @@ class WeatherDataResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class WeatherJobResponse(BaseModel):
+    id: int
+    record_id: int
+    status: str
+    refresh_weather: bool
+    attempts: int
+    error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class WeatherJobAcceptedResponse(BaseModel):
+    job: WeatherJobResponse
+    record: WeatherRecordResponse
+
+def location_to_dict(location) -> Dict[str, Any]:
+    return {
+        "id": location.id,
+        "name": location.name,
+        "latitude": location.latitude,
+        "longitude": location.longitude
+    }
+
+def weather_record_to_dict(record) -> Dict[str, Any]:
+    return {
+        "id": record.id,
+        "location_id": record.location_id,
+        "start_date": record.start_date,
+        "end_date": record.end_date,
+        "weather_data": record.weather_data,
+        "created_at": record.created_at,
+        "updated_at": record.updated_at,
+        "status": record.status,
+        "location": location_to_dict(record.location) if record.location else None
+    }
+
+def weather_job_to_dict(job) -> Dict[str, Any]:
+    return {
+        "id": job.id,
+        "record_id": job.record_id,
+        "status": job.status,
+        "refresh_weather": job.refresh_weather,
+        "attempts": job.attempts,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    }
@@ -1,15 +1,125 @@
-import json
-from typing import List, Dict
-from datetime import datetime
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+import orjson
+from pathlib import Path
+from typing import Callable, List, Dict, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+
+from app.core.config import settings
+
+SNAPSHOT_PREFIX = "weather-data-"
+SNAPSHOT_SUFFIX = ".json.gz"
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
 
 class ExportService:
-    
-    def export_weather_data(self, records: List[Dict]) -> bytes:
+
+    def __init__(self, cursor_lag_seconds: int = 5, snapshot_dir: Optional[str] = None, snapshot_keep: Optional[int] = None):
+        self.cursor_lag = timedelta(seconds=cursor_lag_seconds)
+        self.snapshot_dir = Path(snapshot_dir or settings.EXPORT_SNAPSHOT_DIR)
+        self.snapshot_keep = max(1, snapshot_keep or settings.EXPORT_SNAPSHOT_KEEP)
+        self._snapshot_lock = threading.Lock()
+
+    def parse_cursor(self, cursor: str) -> datetime:
+        try:
+            since = datetime.fromisoformat(cursor.replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"Invalid cursor '{cursor}'")
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return since.astimezone(timezone.utc)
+
+    def next_cursor(self, high_water_mark: Tuple[Optional[datetime], Optional[datetime]], since: Optional[datetime] = None) -> str:
+        stamps = [_as_utc(stamp) for stamp in high_water_mark if stamp]
+        cursor = max(stamps) - self.cursor_lag if stamps else EPOCH
+        if since and since > cursor:
+            cursor = since
+        return cursor.isoformat().replace("+00:00", "Z")
+
+    def _encode(self, export_data: Dict) -> bytes:
+        return orjson.dumps(export_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS, default=str)
+
+    def export_weather_data(self, records: List[Dict], cursor: Optional[str] = None) -> bytes:
         export_data = {
             "export_info": {
                 "timestamp": datetime.now().isoformat(),
-                "total_records": len(records)
+                "total_records": len(records),
+                "cursor": cursor
             },
             "weather_records": records
         }
-        return json.dumps(export_data, indent=2, default=str).encode('utf-8')
+        return self._encode(export_data)
+
+    def export_weather_delta(self, records: List[Dict], deleted_ids: List[int], since: str, cursor: str) -> bytes:
+        export_data = {
+            "export_info": {
+                "timestamp": datetime.now().isoformat(),
+                "since": since,
+                "cursor": cursor,
+                "total_records": len(records),
+                "total_deleted": len(deleted_ids)
+            },
+            "weather_records": records,
+            "deleted_ids": deleted_ids
+        }
+        return self._encode(export_data)
+
+    def snapshot_version(self, high_water_mark: Tuple[Optional[datetime], Optional[datetime]]) -> str:
+        last_update, last_delete = high_water_mark
+        return hashlib.sha1(f"{last_update}:{last_delete}".encode("utf-8")).hexdigest()[:16]
+
+    def snapshot_path(self, version: str) -> Path:
+        return self.snapshot_dir / f"{SNAPSHOT_PREFIX}{version}{SNAPSHOT_SUFFIX}"
+
+    def get_snapshot(self, version: str) -> Optional[Path]:
+        path = self.snapshot_path(version)
+        return path if path.exists() else None
+
+    def ensure_snapshot(self, version: str, cursor: str, load_records: Callable[[], List[Dict]]) -> Path:
+        path = self.get_snapshot(version)
+        if path:
+            return path
+        with self._snapshot_lock:
+            path = self.get_snapshot(version)
+            if path:
+                return path
+            return self.build_snapshot(version, load_records(), cursor)
+
+    def build_snapshot(self, version: str, records: List[Dict], cursor: Optional[str] = None) -> Path:
+        self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        path = self.snapshot_path(version)
+        payload = gzip.compress(self.export_weather_data(records, cursor=cursor), compresslevel=6)
+
+        fd, tmp_name = tempfile.mkstemp(prefix=".tmp-", suffix=SNAPSHOT_SUFFIX, dir=self.snapshot_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(payload)
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+        self._prune_snapshots(keep=path)
+        return path
+
+    def _prune_snapshots(self, keep: Path) -> None:
+        snapshots = sorted(
+            (p for p in self.snapshot_dir.glob(f"{SNAPSHOT_PREFIX}*{SNAPSHOT_SUFFIX}") if p != keep),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True
+        )
+        for stale in snapshots[self.snapshot_keep - 1:]:
+            try:
+                stale.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,260 @@
+import asyncio
+import functools
+import os
+import requests
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+load_dotenv()
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app.core.config import settings
+
+def normalize_location(location: str) -> str:
+    return " ".join(location.strip().lower().split())
+
+def is_zip_code(location: str) -> bool:
+    clean_location = location.replace(" ", "").replace("-", "")
+    return clean_location.isdigit() and len(clean_location) >= 4
+
+def is_coordinate_string(location: str) -> bool:
+    try:
+        clean_location = location.replace(" ", "")
+        if "," in clean_location:
+            parts = clean_location.split(",")
+            if len(parts) == 2:
+                lat = float(parts[0])
+                lon = float(parts[1])
+                return -90 <= lat <= 90 and -180 <= lon <= 180
+    except (ValueError, IndexError):
+        pass
+    return False
+
+def parse_coordinates(location: str) -> Tuple[float, float]:
+    clean_location = location.replace(" ", "")
+    parts = clean_location.split(",")
+    return float(parts[0]), float(parts[1])
+
+class LocationNotFoundError(ValueError):
+    pass
+
+class GeocodingService:
+
+    def __init__(self, cache_size: Optional[int] = None, concurrency: Optional[int] = None, not_found_ttl: Optional[float] = None):
+        self.openweather_key = os.getenv("OPENWEATHER_API_KEY", "your_api_key_here")
+        self.google_key = os.getenv("GOOGLE_MAPS_API_KEY", "")
+        self.openweather_url = "http://api.openweathermap.org/geo/1.0"
+        self.google_url = "https://maps.googleapis.com/maps/api/geocode/json"
+        self.cache_size = cache_size or settings.GEOCODE_CACHE_SIZE
+        self.concurrency = concurrency or settings.GEOCODE_BATCH_CONCURRENCY
+        self.not_found_ttl = not_found_ttl if not_found_ttl is not None else settings.GEOCODE_NOT_FOUND_TTL_SECONDS
+        self._forward_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._reverse_cache: "OrderedDict[Tuple[float, float], Dict]" = OrderedDict()
+        self._not_found_cache: "OrderedDict[Hashable, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def _forward_providers(self) -> List[Callable[[str], Dict]]:
+        providers = [self._openweather_forward]
+        if self.google_key:
+            providers.insert(0, self._google_forward)
+        return providers
+
+    def _reverse_providers(self) -> List[Callable[[float, float], Dict]]:
+        providers = [self._openweather_reverse]
+        if self.google_key:
+            providers.insert(0, self._google_reverse)
+        return providers
+
+    def _cache_get(self, cache: OrderedDict, key: Hashable) -> Optional[Dict]:
+        result = cache.get(key)
+        if result is not None:
+            cache.move_to_end(key)
+        return result
+
+    def _cache_put(self, cache: OrderedDict, key: Hashable, result: Dict) -> None:
+        cache[key] = result
+        cache.move_to_end(key)
+        while len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+    def _not_found_get(self, key: Hashable) -> Optional[str]:
+        entry = self._not_found_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, message = entry
+        if expires_at <= time.monotonic():
+            del self._not_found_cache[key]
+            return None
+        return message
+
+    def _not_found_put(self, key: Hashable, message: str) -> None:
+        if self.not_found_ttl <= 0:
+            return
+        self._not_found_cache[key] = (time.monotonic() + self.not_found_ttl, message)
+        self._not_found_cache.move_to_end(key)
+        while len(self._not_found_cache) > self.cache_size:
+            self._not_found_cache.popitem(last=False)
+
+    async def _cached_lookup(self, cache: OrderedDict, kind: str, key: Hashable, lookup: Callable[[], Awaitable[Dict]]) -> Dict:
+        cached = self._cache_get(cache, key)
+        if cached is not None:
+            return cached
+        not_found = self._not_found_get((kind, key))
+        if not_found is not None:
+            raise LocationNotFoundError(not_found)
+
+        async def resolve() -> Dict:
+            try:
+                result = await lookup()
+            except LocationNotFoundError as e:
+                self._not_found_put((kind, key), str(e))
+                raise
+            self._cache_put(cache, key, result)
+            return result
+
+        return await self._single_flight((kind, key), resolve)
+
+    async def _single_flight(self, key: Hashable, lookup: Callable[[], Awaitable[Dict]]) -> Dict:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(lookup())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def _run_providers(self, providers: List[Callable], *args) -> Dict:
+        loop = asyncio.get_running_loop()
+        errors = []
+        for provider in providers:
+            try:
+                return await loop.run_in_executor(None, functools.partial(provider, *args))
+            except Exception as e:
+                errors.append(e)
+        outages = [e for e in errors if not isinstance(e, LocationNotFoundError)]
+        raise (outages[0] if outages else errors[0])
+
+    async def geocode(self, location: str) -> Dict:
+        if not location or not location.strip():
+            raise LocationNotFoundError("Location cannot be empty")
+
+        if is_coordinate_string(location):
+            lat, lon = parse_coordinates(location)
+            result = await self.reverse(lat, lon)
+            return {**result, "coordinates": {"latitude": lat, "longitude": lon}}
+
+        return await self._cached_lookup(
+            self._forward_cache, "forward", normalize_location(location),
+            lambda: self._run_providers(self._forward_providers(), location)
+        )
+
+    async def reverse(self, lat: float, lon: float) -> Dict:
+        return await self._cached_lookup(
+            self._reverse_cache, "reverse", (round(lat, 4), round(lon, 4)),
+            lambda: self._run_providers(self._reverse_providers(), lat, lon)
+        )
+
+    async def geocode_many(self, locations: List[str], concurrency: Optional[int] = None) -> Dict[str, Any]:
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+        unique_locations = list(OrderedDict.fromkeys(locations))
+
+        async def resolve(location: str):
+            async with semaphore:
+                try:
+                    return await self.geocode(location)
+                except Exception as e:
+                    return e
+
+        resolved = await asyncio.gather(*[resolve(location) for location in unique_locations])
+        return dict(zip(unique_locations, resolved))
+
+    def _get_json(self, url: str, params: Dict) -> Any:
+        try:
+            response = requests.get(url, params=params, timeout=10)
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException as e:
+            raise Exception(f"API error: {str(e)}")
+
+    def _google_forward(self, location: str) -> Dict:
+        params = {"address": location, "key": self.google_key}
+        if is_zip_code(location):
+            params["components"] = "country:US"
+        data = self._get_json(self.google_url, params)
+        if data.get("status") == "ZERO_RESULTS" or (data.get("status") == "OK" and not data.get("results")):
+            raise LocationNotFoundError(f"Location '{location}' not found")
+        if data.get("status") != "OK":
+            raise Exception(f"API error: {data.get('status')}")
+        return self._format_google_result(data["results"][0])
+
+    def _google_reverse(self, lat: float, lon: float) -> Dict:
+        data = self._get_json(self.google_url, {"latlng": f"{lat},{lon}", "key": self.google_key})
+        if data.get("status") == "ZERO_RESULTS" or (data.get("status") == "OK" and not data.get("results")):
+            raise LocationNotFoundError(f"No location found at {lat}, {lon}")
+        if data.get("status") != "OK":
+            raise Exception(f"API error: {data.get('status')}")
+        return self._format_google_result(data["results"][0])
+
+    def _format_google_result(self, result: Dict) -> Dict:
+        geometry = result.get("geometry", {})
+        location = geometry.get("location", {})
+        components = {}
+        for component in result.get("address_components", []):
+            for component_type in component.get("types", []):
+                components.setdefault(component_type, component)
+
+        place = components.get("locality") or components.get("postal_town") or components.get("administrative_area_level_1") or {}
+        country = components.get("country", {})
+        state = components.get("administrative_area_level_1", {})
+
+        return {
+            "name": place.get("long_name") or result.get("formatted_address", ""),
+            "state": state.get("long_name"),
+            "country": country.get("short_name", ""),
+            "formatted_address": result.get("formatted_address", ""),
+            "place_id": result.get("place_id", ""),
+            "coordinates": {
+                "latitude": location.get("lat"),
+                "longitude": location.get("lng")
+            },
+            "location_type": geometry.get("location_type", ""),
+            "types": result.get("types", []),
+            "provider": "google"
+        }
+
+    def _openweather_forward(self, location: str) -> Dict:
+        if is_zip_code(location):
+            url = f"{self.openweather_url}/zip"
+            params = {"zip": f"{location},US", "appid": self.openweather_key}
+        else:
+            url = f"{self.openweather_url}/direct"
+            params = {"q": location, "limit": 1, "appid": self.openweather_key}
+
+        data = self._get_json(url, params)
+        if not data or (isinstance(data, list) and len(data) == 0):
+            raise LocationNotFoundError(f"Location '{location}' not found. Please check spelling or try a different format.")
+        return self._format_openweather_result(data[0] if isinstance(data, list) else data)
+
+    def _openweather_reverse(self, lat: float, lon: float) -> Dict:
+        data = self._get_json(f"{self.openweather_url}/reverse", {"lat": lat, "lon": lon, "limit": 1, "appid": self.openweather_key})
+        if not data:
+            raise LocationNotFoundError(f"No location found at {lat}, {lon}")
+        return self._format_openweather_result(data[0])
+
+    def _format_openweather_result(self, result: Dict) -> Dict:
+        parts = [result.get("name"), result.get("state"), result.get("country")]
+        return {
+            "name": result.get("name", "Unknown"),
+            "state": result.get("state"),
+            "country": result.get("country", "Unknown"),
+            "formatted_address": ", ".join(part for part in parts if part),
+            "place_id": "",
+            "coordinates": {
+                "latitude": result["lat"],
+                "longitude": result["lon"]
+            },
+            "location_type": "",
+            "types": [],
+            "provider": "openweather"
+        }
+
+geocoding_service = GeocodingService()
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import crud
+from app.db.session import SessionLocal
+from app.services.geocoding import LocationNotFoundError
+from app.services.weather import WeatherService
+
+logger = logging.getLogger(__name__)
+
+def get_or_create_location(db: Session, name: str, coordinates: Optional[tuple] = None) -> int:
+    existing_location = crud.get_location_by_name(db, name)
+    if existing_location:
+        if coordinates and existing_location.latitude is None:
+            crud.update_location(db, existing_location.id, {"latitude": str(coordinates[0]), "longitude": str(coordinates[1])})
+        return existing_location.id
+
+    location_data = {"name": name, "latitude": None, "longitude": None}
+    if coordinates:
+        location_data["latitude"] = str(coordinates[0])
+        location_data["longitude"] = str(coordinates[1])
+    return crud.create_location(db, location_data).id
+
+async def resolve_location(db: Session, weather_service: WeatherService, name: str) -> int:
+    coordinates = await weather_service.get_coordinates_from_location(name)
+    return get_or_create_location(db, name, coordinates)
+
+class WeatherJobWorker:
+
+    def __init__(
+        self,
+        weather_service: Optional[WeatherService] = None,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        lease_seconds: Optional[int] = None
+    ):
+        self.weather_service = weather_service or WeatherService()
+        self.concurrency = concurrency or settings.WEATHER_JOB_WORKERS
+        self.poll_interval = poll_interval or settings.WEATHER_JOB_POLL_SECONDS
+        self.max_attempts = max_attempts or settings.WEATHER_JOB_MAX_ATTEMPTS
+        self.lease_seconds = lease_seconds or settings.WEATHER_JOB_LEASE_SECONDS
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.run_once()
+            except Exception:
+                logger.exception("Weather job worker iteration failed")
+                processed = False
+
+            if processed:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def run_once(self) -> bool:
+        db = SessionLocal()
+        try:
+            job = crud.claim_weather_job(db, self.lease_seconds)
+            if not job:
+                return False
+            await self._process(db, job)
+            return True
+        finally:
+            db.close()
+
+    async def _process(self, db: Session, job) -> None:
+        try:
+            record = crud.get_weather_record(db, job.record_id)
+            if not record:
+                crud.finish_weather_job(db, job.id, "failed", "Record not found")
+                return
+
+            location = record.location
+            if location is None:
+                raise ValueError("Record has no location")
+            if location.latitude is None or location.longitude is None:
+                await resolve_location(db, self.weather_service, location.name)
+
+            update_data = {"status": "ready"}
+            if job.refresh_weather or record.weather_data is None:
+                update_data["weather_data"] = await self.weather_service.get_weather_summary(location.name)
+
+            crud.update_weather_record(db, record.id, update_data)
+            crud.finish_weather_job(db, job.id, "succeeded")
+
+        except Exception as e:
+            db.rollback()
+            logger.warning("Weather job %s failed on attempt %s: %s", job.id, job.attempts, e)
+            if job.attempts < self.max_attempts and not isinstance(e, ValueError):
+                crud.finish_weather_job(db, job.id, "pending", str(e), retry_in=self.poll_interval * 2 ** job.attempts)
+            else:
+                if isinstance(e, LocationNotFoundError):
+                    crud.release_unresolved_location(db, job.record_id)
+                crud.update_weather_record(db, job.record_id, {"status": "failed"})
+                crud.finish_weather_job(db, job.id, "failed", str(e))
+
+weather_job_worker = WeatherJobWorker()
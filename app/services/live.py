@@ -0,0 +1,102 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.geocoding import normalize_location
+from app.services.weather import WeatherService
+
+logger = logging.getLogger(__name__)
+
+def diff_weather(old: Any, new: Any) -> Optional[Any]:
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = {}
+        for key, value in new.items():
+            if key not in old:
+                changes[key] = value
+                continue
+            change = diff_weather(old[key], value)
+            if change is not None:
+                changes[key] = change
+        return changes or None
+    return None if old == new else new
+
+class _Channel:
+
+    def __init__(self, location: str):
+        self.location = location
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.latest: Optional[Dict] = None
+        self.task: Optional[asyncio.Task] = None
+
+class LiveWeatherHub:
+
+    def __init__(self, weather_service: Optional[WeatherService] = None, interval: Optional[float] = None, queue_size: Optional[int] = None):
+        self.weather_service = weather_service or WeatherService()
+        self.interval = interval or settings.LIVE_WEATHER_POLL_SECONDS
+        self.queue_size = queue_size or settings.LIVE_WEATHER_QUEUE_SIZE
+        self._channels: Dict[str, _Channel] = {}
+
+    def subscribe(self, location: str) -> Tuple[str, asyncio.Queue]:
+        key = normalize_location(location)
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = _Channel(location)
+            self._channels[key] = channel
+            channel.task = asyncio.create_task(self._poll(channel))
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        if channel.latest is not None:
+            queue.put_nowait({"event": "snapshot", "data": channel.latest})
+        channel.subscribers.add(queue)
+        return key, queue
+
+    def unsubscribe(self, key: str, queue: asyncio.Queue) -> None:
+        channel = self._channels.get(key)
+        if channel is None:
+            return
+        channel.subscribers.discard(queue)
+        if not channel.subscribers:
+            del self._channels[key]
+            if channel.task is not None:
+                channel.task.cancel()
+
+    async def stop(self) -> None:
+        tasks = [channel.task for channel in self._channels.values() if channel.task is not None]
+        self._channels.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _publish(self, channel: _Channel, event: Dict) -> None:
+        for queue in channel.subscribers:
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"event": "snapshot", "data": channel.latest} if channel.latest is not None else event)
+
+    async def _poll(self, channel: _Channel) -> None:
+        while True:
+            try:
+                weather = await self.weather_service.get_current_weather(channel.location)
+            except Exception as e:
+                logger.warning("Live weather poll for %s failed: %s", channel.location, e)
+                self._publish(channel, {"event": "error", "data": {"detail": str(e)}})
+            else:
+                if channel.latest is None:
+                    channel.latest = weather
+                    self._publish(channel, {"event": "snapshot", "data": weather})
+                else:
+                    delta = diff_weather(channel.latest, weather)
+                    channel.latest = weather
+                    if delta is not None:
+                        self._publish(channel, {"event": "delta", "data": delta})
+            await asyncio.sleep(self.interval)
+
+    @property
+    def channel_count(self) -> int:
+        return len(self._channels)
+
+live_weather_hub = LiveWeatherHub()
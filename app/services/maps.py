@@ -1,73 +1,109 @@
+import asyncio
+import functools
+import hashlib
+import re
 import requests
 import os
 from dotenv import load_dotenv
 load_dotenv()
-from typing import Dict, List
+from pathlib import Path
+from typing import Dict, List, Optional
 from app.core.config import settings
+from app.services.geocoding import GeocodingService, geocoding_service
+from app.services.map_cache import DiskLRUCache
+
+MAP_TYPES = {"roadmap", "satellite", "terrain", "hybrid"}
+MAP_SIZE_PATTERN = re.compile(r"^(\d{1,4})x(\d{1,4})$")
 
 class MapsService:
     
-    def __init__(self):
+    def __init__(self, geocoder: Optional[GeocodingService] = None):
         self.api_key = os.getenv("GOOGLE_MAPS_API_KEY", "")
-        self.geocoding_url = "https://maps.googleapis.com/maps/api/geocode/json"
-        self.static_maps_url = "https://maps.googleapis.com/maps/api/staticmap"
+        self.geocoder = geocoder or geocoding_service
+        self.static_maps_url = os.getenv("GOOGLE_STATIC_MAPS_URL", "https://maps.googleapis.com/maps/api/staticmap")
+        self.map_cache = DiskLRUCache(settings.MAP_CACHE_DIR, settings.MAP_CACHE_MAX_BYTES)
+        self._inflight_maps: Dict[str, asyncio.Future] = {}
     
     def _validate_api_key(self) -> bool:
         return self.api_key
     
     async def get_location_details(self, location: str) -> Dict:
-        if not self._validate_api_key():
-            raise Exception("API key not configured")
-        
-        try:
-            params = {
-                "address": location,
-                "key": self.api_key
-            }
-            
-            response = requests.get(self.geocoding_url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data["status"] != "OK" or not data.get("results"):
-                raise ValueError(f"Location '{location}' not found")
-            
-            result = data["results"][0]
-            return self._format_location_details(result)
-            
-        except requests.RequestException as e:
-            raise Exception(f"API error: {str(e)}")
-        except Exception as e:
-            raise e
+        result = await self.geocoder.geocode(location)
+        return self._format_location_details(result)
     
-    def _format_location_details(self, result: Dict) -> Dict:       
-        geometry = result.get("geometry", {})
-        location = geometry.get("location", {})
-        
+    async def get_location_details_batch(self, locations: List[str]) -> Dict:
+        resolved = await self.geocoder.geocode_many(locations)
+        results = {}
+        errors = {}
+        for location, result in resolved.items():
+            if isinstance(result, Exception):
+                errors[location] = str(result)
+            else:
+                results[location] = self._format_location_details(result)
+        return {"results": results, "errors": errors}
+    
+    def _format_location_details(self, result: Dict) -> Dict:
         return {
             "formatted_address": result.get("formatted_address", ""),
             "place_id": result.get("place_id", ""),
-            "coordinates": {
-                "latitude": location.get("lat"),
-                "longitude": location.get("lng")
-            },
-            "location_type": geometry.get("location_type", ""),
+            "coordinates": result.get("coordinates", {}),
+            "location_type": result.get("location_type", ""),
             "types": result.get("types", [])
         }
     
-    def get_static_map_url(self, latitude: float, longitude: float, zoom: int = 10, size: str = "400x400", map_type: str = "roadmap") -> str:
-        if not self._validate_api_key():
-            raise Exception("API key not configured")
+    def _quantize_coordinates(self, latitude: float, longitude: float, zoom: int):
+        step = 360.0 / (256 * 2 ** zoom)
+        return round(round(latitude / step) * step, 6), round(round(longitude / step) * step, 6)
+    
+    def _static_map_params(self, latitude: float, longitude: float, zoom: int, size: str, map_type: str) -> Dict:
+        if not MAP_SIZE_PATTERN.match(size):
+            raise ValueError(f"Invalid map size '{size}', expected WIDTHxHEIGHT")
+        if map_type not in MAP_TYPES:
+            raise ValueError(f"Invalid map type '{map_type}'")
         
-        params = {
-            "center": f"{latitude},{longitude}",
+        lat, lon = self._quantize_coordinates(latitude, longitude, zoom)
+        return {
+            "center": f"{lat},{lon}",
             "zoom": zoom,
             "size": size,
             "maptype": map_type,
-            "markers": f"color:red|{latitude},{longitude}",
-            "key": self.api_key
+            "markers": f"color:red|{lat},{lon}",
+            "format": "png"
         }
+    
+    def static_map_key(self, latitude: float, longitude: float, zoom: int = 10, size: str = "400x400", map_type: str = "roadmap") -> str:
+        params = self._static_map_params(latitude, longitude, zoom, size, map_type)
+        raw_key = "|".join(f"{k}={params[k]}" for k in sorted(params))
+        return hashlib.sha1(raw_key.encode("utf-8")).hexdigest()
+    
+    async def get_static_map_image(self, latitude: float, longitude: float, zoom: int = 10, size: str = "400x400", map_type: str = "roadmap") -> Path:
+        if not self._validate_api_key():
+            raise Exception("API key not configured")
+        
+        key = self.static_map_key(latitude, longitude, zoom, size, map_type)
+        path = self.map_cache.get(key)
+        if path:
+            return path
+        
+        future = self._inflight_maps.get(key)
+        if future is None:
+            params = self._static_map_params(latitude, longitude, zoom, size, map_type)
+            future = asyncio.ensure_future(self._fetch_static_map(key, params))
+            self._inflight_maps[key] = future
+            future.add_done_callback(lambda _: self._inflight_maps.pop(key, None))
+        return await asyncio.shield(future)
+    
+    async def _fetch_static_map(self, key: str, params: Dict) -> Path:
+        try:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(None, functools.partial(
+                requests.get, self.static_maps_url, params={**params, "key": self.api_key}, timeout=10
+            ))
+            response.raise_for_status()
+        except requests.RequestException as e:
+            raise Exception(f"API error: {str(e)}")
+        
+        if not response.headers.get("Content-Type", "").startswith("image/"):
+            raise Exception("API error: static map response is not an image")
         
-        param_string = "&".join([f"{k}={v}" for k, v in params.items()])
-        return f"{self.static_maps_url}?{param_string}"
+        return await loop.run_in_executor(None, self.map_cache.put, key, response.content)
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db import crud
+from app.db.session import SessionLocal
+from app.services.geocoding import normalize_location
+
+logger = logging.getLogger(__name__)
+
+RESOLUTIONS = ("hour", "day")
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def bucket_start(value: datetime, resolution: str) -> datetime:
+    value = _as_utc(value)
+    if resolution == "hour":
+        return value.replace(minute=0, second=0, microsecond=0)
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _mean(values: List[float]) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return round(sum(values) / len(values), 2) if values else None
+
+class ObservationService:
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        raw_retention_days: Optional[int] = None,
+        hourly_retention_days: Optional[int] = None
+    ):
+        self.interval = interval or settings.OBSERVATION_ROLLUP_SECONDS
+        self.raw_retention = timedelta(days=max(2, raw_retention_days or settings.OBSERVATION_RAW_RETENTION_DAYS))
+        self.hourly_retention = timedelta(days=hourly_retention_days or settings.OBSERVATION_HOURLY_RETENTION_DAYS)
+        self._task: Optional[asyncio.Task] = None
+        self._caught_up = False
+
+    def record_current_weather(self, db: Session, location: str, weather: Dict):
+        current = weather["current"]
+        observed_at = datetime.fromisoformat(current["timestamp"]).astimezone(timezone.utc)
+        return crud.create_weather_observation(db, {
+            "location_key": normalize_location(location),
+            "observed_at": observed_at,
+            "temperature": current.get("temperature"),
+            "feels_like": current.get("feels_like"),
+            "humidity": current.get("humidity"),
+            "pressure": current.get("pressure"),
+            "wind_speed": current.get("wind", {}).get("speed"),
+            "wind_direction": current.get("wind", {}).get("direction"),
+            "clouds": current.get("clouds"),
+            "visibility": current.get("visibility"),
+            "condition": current.get("condition", {}).get("main")
+        })
+
+    def rollup(self, db: Session, since: Optional[datetime] = None) -> int:
+        if since is None:
+            since = datetime.now(timezone.utc) - timedelta(days=1)
+        since = bucket_start(since, "day")
+
+        buckets = defaultdict(list)
+        for observation in crud.get_weather_observations_since(db, since):
+            for resolution in RESOLUTIONS:
+                key = (observation.location_key, resolution, bucket_start(observation.observed_at, resolution))
+                buckets[key].append(observation)
+
+        rollups = []
+        for (location_key, resolution, start), observations in buckets.items():
+            temperatures = [o.temperature for o in observations if o.temperature is not None]
+            wind_speeds = [o.wind_speed for o in observations if o.wind_speed is not None]
+            rollups.append({
+                "location_key": location_key,
+                "resolution": resolution,
+                "bucket_start": start,
+                "sample_count": len(observations),
+                "temperature_min": min(temperatures) if temperatures else None,
+                "temperature_max": max(temperatures) if temperatures else None,
+                "temperature_avg": _mean(temperatures),
+                "humidity_avg": _mean([o.humidity for o in observations]),
+                "pressure_avg": _mean([o.pressure for o in observations]),
+                "wind_speed_avg": _mean(wind_speeds),
+                "wind_speed_max": max(wind_speeds) if wind_speeds else None
+            })
+
+        crud.upsert_weather_rollups(db, rollups)
+        return len(rollups)
+
+    def apply_retention(self, db: Session) -> Dict[str, int]:
+        now = datetime.now(timezone.utc)
+        return {
+            "observations": crud.delete_weather_observations_before(db, bucket_start(now - self.raw_retention, "day")),
+            "hourly_rollups": crud.delete_weather_rollups_before(db, "hour", now - self.hourly_retention)
+        }
+
+    def run_maintenance(self) -> None:
+        db = SessionLocal()
+        try:
+            since = None if self._caught_up else datetime.now(timezone.utc) - self.raw_retention
+            self.rollup(db, since)
+            self._caught_up = True
+            self.apply_retention(db)
+        finally:
+            db.close()
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                await loop.run_in_executor(None, self.run_maintenance)
+            except Exception:
+                logger.exception("Observation rollup failed")
+            await asyncio.sleep(self.interval)
+
+observation_service = ObservationService()
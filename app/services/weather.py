@@ -1,74 +1,39 @@
+import asyncio
+import functools
 import requests
 import os
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+from app.services.geocoding import GeocodingService, geocoding_service, is_zip_code, is_coordinate_string, parse_coordinates
+
 class WeatherService:
     
-    def __init__(self):
+    def __init__(self, geocoder: Optional[GeocodingService] = None):
         self.api_key = os.getenv("OPENWEATHER_API_KEY", "your_api_key_here")
         self.base_url = "http://api.openweathermap.org/data/2.5"
-        self.geocoding_url = "http://api.openweathermap.org/geo/1.0"
+        self.geocoder = geocoder or geocoding_service
     
     def _is_zip_code(self, location: str) -> bool:
-        clean_location = location.replace(" ", "").replace("-", "")
-        return clean_location.isdigit() and len(clean_location) >= 4
+        return is_zip_code(location)
     
     def _is_coordinate_string(self, location: str) -> bool:
-        try:
-            clean_location = location.replace(" ", "")
-            if "," in clean_location:
-                parts = clean_location.split(",")
-                if len(parts) == 2:
-                    lat = float(parts[0])
-                    lon = float(parts[1])
-                    return -90 <= lat <= 90 and -180 <= lon <= 180
-        except (ValueError, IndexError):
-            pass
-        return False
+        return is_coordinate_string(location)
     
     def _parse_coordinates(self, location: str) -> Tuple[float, float]:
-        clean_location = location.replace(" ", "")
-        parts = clean_location.split(",")
-        return float(parts[0]), float(parts[1])
+        return parse_coordinates(location)
     
     async def get_coordinates_from_location(self, location: str) -> Tuple[float, float]:
-        try:
-            if self._is_coordinate_string(location):
-                return self._parse_coordinates(location)
-            
-            if self._is_zip_code(location):
-                url = f"{self.geocoding_url}/zip"
-                params = {
-                    "zip": f"{location},US",
-                    "appid": self.api_key
-                }
-            else:
-                url = f"{self.geocoding_url}/direct"
-                params = {
-                    "q": location,
-                    "limit": 1,
-                    "appid": self.api_key
-                }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            if not data or (isinstance(data, list) and len(data) == 0):
-                raise ValueError(f"Location '{location}' not found. Please check spelling or try a different format.")
-            
-            if isinstance(data, list):
-                result = data[0]
-            else:
-                result = data
-            
-            return result["lat"], result["lon"]
-                
-        except requests.RequestException as e:
-            raise Exception(f"API error: {str(e)}")
-        except Exception as e:
-            raise e
+        if self._is_coordinate_string(location):
+            return self._parse_coordinates(location)
+        
+        result = await self.geocoder.geocode(location)
+        coordinates = result["coordinates"]
+        return coordinates["latitude"], coordinates["longitude"]
+    
+    async def _fetch(self, url: str, params: Dict) -> requests.Response:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(requests.get, url, params=params, timeout=10))
     
     async def get_current_weather(self, location: str) -> Dict:
         try:
@@ -82,7 +47,7 @@ class WeatherService:
                 "units": "metric"
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = await self._fetch(url, params)
             response.raise_for_status()
             
             data = response.json()
@@ -105,7 +70,7 @@ class WeatherService:
                 "units": "metric"
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = await self._fetch(url, params)
             response.raise_for_status()
             
             data = response.json()
@@ -265,23 +230,7 @@ class WeatherService:
     
     async def get_location_name_from_coordinates(self, lat: float, lon: float) -> str:
         try:
-            url = f"{self.geocoding_url}/reverse"
-            params = {
-                "lat": lat,
-                "lon": lon,
-                "limit": 1,
-                "appid": self.api_key
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            if data:
-                result = data[0]
-                return f"{result.get('name', 'Unknown')}, {result.get('country', 'Unknown')}"
-            else:
-                return f"Location at {lat}, {lon}"
-                
+            result = await self.geocoder.reverse(lat, lon)
+            return f"{result.get('name') or 'Unknown'}, {result.get('country') or 'Unknown'}"
         except Exception as e:
             return f"Location at {lat}, {lon}"
\ No newline at end of file
@@ -0,0 +1,89 @@
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.schemas.weather_crud import WeatherRecordListResponse, weather_record_to_dict
+
+def sample_weather_data(i: int) -> dict:
+    forecast = []
+    for day in range(5):
+        forecast.append({
+            "date": (date(2025, 1, 1) + timedelta(days=day)).isoformat(),
+            "day_name": "Monday",
+            "temperature": {"min": 3 + day, "max": 11 + day, "avg": 7 + day},
+            "condition": {"main": "Clouds", "description": "broken clouds", "icon": "04d"},
+            "humidity": 71,
+            "wind_speed": 4.2,
+            "pressure": 1013
+        })
+    return {
+        "location": {"name": f"City {i}", "country": "US", "coordinates": {"lat": 40.7128, "lon": -74.006}},
+        "current": {
+            "temperature": 9,
+            "feels_like": 7,
+            "humidity": 68,
+            "pressure": 1012,
+            "visibility": 10.0,
+            "condition": {"main": "Clouds", "description": "overcast clouds", "icon": "04d"},
+            "wind": {"speed": 3.6, "direction": 240},
+            "clouds": 90,
+            "timestamp": "2025-01-01T12:00:00",
+            "sunrise": "07:20",
+            "sunset": "16:39"
+        },
+        "forecast": forecast,
+        "summary": {"current_temp": 9, "condition": "overcast clouds", "forecast_high": 15, "forecast_low": 3}
+    }
+
+def sample_records(count: int) -> list:
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    records = []
+    for i in range(count):
+        location = SimpleNamespace(id=i % 50, name=f"City {i % 50}", latitude="40.7128", longitude="-74.006")
+        records.append(SimpleNamespace(
+            id=i,
+            location_id=location.id,
+            start_date=date(2025, 1, 1),
+            end_date=date(2025, 1, 6),
+            weather_data=sample_weather_data(i),
+            created_at=now,
+            updated_at=now,
+            version=1,
+            status="ready",
+            location=location
+        ))
+    return records
+
+adapter = TypeAdapter(List[WeatherRecordListResponse])
+
+def validated_path(records) -> bytes:
+    models = [WeatherRecordListResponse.from_orm(record) for record in records]
+    content = adapter.validate_python([model.model_dump() for model in models])
+    return json.dumps(adapter.dump_python(content, mode="json"), ensure_ascii=False).encode("utf-8")
+
+def fast_path(records) -> bytes:
+    return orjson.dumps([weather_record_to_dict(record) for record in records], option=orjson.OPT_NON_STR_KEYS)
+
+def measure(fn, records, rounds: int) -> float:
+    fn(records)
+    start = time.process_time()
+    for _ in range(rounds):
+        fn(records)
+    return (time.process_time() - start) / rounds * 1000
+
+if __name__ == "__main__":
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for page_size in (100, 1000):
+        records = sample_records(page_size)
+        before = measure(validated_path, records, rounds)
+        after = measure(fast_path, records, rounds)
+        print(f"page={page_size:5d}  validated+json: {before:8.2f} ms  orjson fast path: {after:8.2f} ms  speedup: {before / after:5.1f}x")
@@ -0,0 +1,55 @@
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import orjson
+
+from app.db.types import build_dictionary, decode_payload, encode_payload, zstandard
+from bench_serialization import sample_weather_data
+
+def varied_weather_data(i: int) -> dict:
+    rng = random.Random(i)
+    data = sample_weather_data(i)
+    data["current"]["temperature"] = rng.randint(-10, 35)
+    data["current"]["humidity"] = rng.randint(20, 100)
+    data["current"]["wind"]["speed"] = round(rng.uniform(0, 15), 1)
+    for day in data["forecast"]:
+        low = rng.randint(-10, 25)
+        day["temperature"] = {"min": low, "max": low + rng.randint(2, 12), "avg": low + 4}
+        day["humidity"] = rng.randint(20, 100)
+        day["wind_speed"] = round(rng.uniform(0, 15), 1)
+    return data
+
+def measure(name: str, rows: list, codec: str, dictionary=None) -> None:
+    raw_rows = [orjson.dumps(row) for row in rows]
+    stored = [encode_payload(raw, codec, 6, dictionary) for raw in raw_rows]
+    raw_bytes = sum(len(raw) for raw in raw_rows)
+    stored_bytes = sum(len(payload) for payload in stored)
+
+    start = time.perf_counter()
+    for payload in stored:
+        orjson.loads(decode_payload(payload, dictionary))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{name:12s} avg row {stored_bytes / len(rows):7.0f} B  "
+        f"ratio {raw_bytes / stored_bytes:5.2f}x  "
+        f"read {len(rows) / elapsed:9.0f} rows/s"
+    )
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    rows = [varied_weather_data(i) for i in range(count)]
+    training = [varied_weather_data(count + i) for i in range(500)]
+
+    measure("json", rows, "none")
+    measure("zlib", rows, "zlib")
+    measure("zlib+dict", rows, "zlib", build_dictionary(training, "zlib"))
+    if zstandard is not None:
+        measure("zstd", rows, "zstd")
+        measure("zstd+dict", rows, "zstd", build_dictionary(training, "zstd", size=16 * 1024))
+    else:
+        print("zstd         skipped (install 'zstandard')")
@@ -5,16 +5,35 @@ from app.api.weather import router as weather_router
 from app.api.weather_crud import router as weather_crud_router
 from app.api.export import router as export_router
 from app.api.maps import router as maps_router
+from app.core.compression import CompressionMiddleware
+from app.core.read_your_writes import ReadYourWritesMiddleware
+from app.core.config import settings
+from app.services.jobs import weather_job_worker
+from app.services.observations import observation_service
+from app.services.live import live_weather_hub
 import uvicorn
 
 Base.metadata.create_all(bind=engine)
 
 app = FastAPI(title="Weather API", version="1.0.0")
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=settings.REPLICA_STICKY_SECONDS)
 app.include_router(weather_router)
 app.include_router(weather_crud_router)
 app.include_router(export_router)
 app.include_router(maps_router)
 
+@app.on_event("startup")
+async def start_background_workers():
+    weather_job_worker.start()
+    observation_service.start()
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await weather_job_worker.stop()
+    await observation_service.stop()
+    await live_weather_hub.stop()
+
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,96 @@
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import JSON, Column, Integer, LargeBinary, MetaData, Table, bindparam, inspect, select, text, update
+
+from app.core.config import settings
+from app.db.session import engine
+from app.db.types import CODECS, CompressedJSON, build_dictionary, load_dictionary
+
+TABLE = "weather_records"
+
+def current_storage(conn) -> str:
+    for column in inspect(conn).get_columns(TABLE):
+        if column["name"] == "weather_data":
+            return "compressed" if isinstance(column["type"], LargeBinary) else "json"
+    raise RuntimeError(f"{TABLE}.weather_data not found")
+
+def storage_type(storage: str, codec: str = "none", level: int = 6, dictionary=None):
+    if storage == "json":
+        return JSON
+    return CompressedJSON(codec=codec, level=level, dictionary=dictionary)
+
+def weather_records_table(source_type, target_type=None) -> Table:
+    columns = [Column("id", Integer, primary_key=True), Column("weather_data", source_type)]
+    if target_type is not None:
+        columns.append(Column("weather_data_new", target_type))
+    return Table(TABLE, MetaData(), *columns)
+
+def migrate(target: str, codec: str, level: int, dictionary, source_dictionary, batch_size: int) -> int:
+    target_type = storage_type(target, codec, level, dictionary)
+    copied = 0
+
+    with engine.begin() as conn:
+        source_type = storage_type(current_storage(conn), dictionary=source_dictionary)
+        column_sql = (target_type.impl if isinstance(target_type, CompressedJSON) else target_type()).compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {TABLE} ADD COLUMN weather_data_new {column_sql}"))
+
+        table = weather_records_table(source_type, target_type)
+        statement = update(table).where(table.c.id == bindparam("record_id")).values(
+            weather_data_new=bindparam("payload", type_=target_type)
+        )
+
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                select(table.c.id, table.c.weather_data).where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            conn.execute(statement, [{"record_id": row.id, "payload": row.weather_data} for row in rows])
+            copied += len(rows)
+            last_id = rows[-1].id
+
+        conn.execute(text(f"ALTER TABLE {TABLE} DROP COLUMN weather_data"))
+        conn.execute(text(f"ALTER TABLE {TABLE} RENAME COLUMN weather_data_new TO weather_data"))
+
+    return copied
+
+def write_dictionary(path: str, codec: str, samples: int, size: int, source_dictionary) -> int:
+    with engine.connect() as conn:
+        table = weather_records_table(storage_type(current_storage(conn), dictionary=source_dictionary))
+        rows = conn.execute(
+            select(table.c.weather_data).where(table.c.weather_data.isnot(None)).order_by(table.c.id.desc()).limit(samples)
+        ).all()
+    dictionary = build_dictionary((row.weather_data for row in rows), codec=codec, size=size)
+    Path(path).write_bytes(dictionary)
+    return len(dictionary)
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert weather_records.weather_data between JSON and compressed storage.")
+    parser.add_argument("--to", choices=["compressed", "json"], default="compressed")
+    parser.add_argument("--codec", choices=CODECS, default=settings.WEATHER_DATA_COMPRESSION if settings.WEATHER_DATA_COMPRESSION != "none" else "zlib")
+    parser.add_argument("--level", type=int, default=settings.WEATHER_DATA_COMPRESSION_LEVEL)
+    parser.add_argument("--dictionary", default=settings.WEATHER_DATA_DICTIONARY_PATH, help="Dictionary used for the new storage format")
+    parser.add_argument("--source-dictionary", default=None, help="Dictionary the existing rows were compressed with")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--build-dictionary", metavar="PATH", help="Train a dictionary from existing rows and exit")
+    parser.add_argument("--samples", type=int, default=1000)
+    parser.add_argument("--dictionary-size", type=int, default=32 * 1024)
+    args = parser.parse_args()
+
+    source_dictionary = load_dictionary(args.source_dictionary)
+
+    if args.build_dictionary:
+        size = write_dictionary(args.build_dictionary, args.codec, args.samples, args.dictionary_size, source_dictionary)
+        print(f"Wrote {size} byte {args.codec} dictionary to {args.build_dictionary}")
+        return
+
+    copied = migrate(args.to, args.codec, args.level, load_dictionary(args.dictionary), source_dictionary, args.batch_size)
+    print(f"Converted {copied} rows to {args.to} storage")
+
+if __name__ == "__main__":
+    main()
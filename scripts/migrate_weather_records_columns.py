@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import DateTime, inspect, text
+
+from app.db.models import WeatherRecord
+from app.db.session import engine
+
+TABLE = "weather_records"
+
+def existing_columns(conn) -> set:
+    return {column["name"] for column in inspect(conn).get_columns(TABLE)}
+
+def migrate() -> list:
+    added = []
+
+    with engine.begin() as conn:
+        columns = existing_columns(conn)
+
+        if "updated_at" not in columns:
+            column_sql = DateTime(timezone=True).compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {TABLE} ADD COLUMN updated_at {column_sql}"))
+            added.append("updated_at")
+        conn.execute(text(f"UPDATE {TABLE} SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE updated_at IS NULL"))
+
+        if "version" not in columns:
+            conn.execute(text(f"ALTER TABLE {TABLE} ADD COLUMN version INTEGER NOT NULL DEFAULT 1"))
+            added.append("version")
+
+        if "status" not in columns:
+            conn.execute(text(f"ALTER TABLE {TABLE} ADD COLUMN status VARCHAR NOT NULL DEFAULT 'ready'"))
+            added.append("status")
+
+        for index in WeatherRecord.__table__.indexes:
+            index.create(conn, checkfirst=True)
+
+    return added
+
+def main():
+    if not inspect(engine).has_table(TABLE):
+        print(f"{TABLE} does not exist yet; it will be created with the current schema on startup")
+        return
+    added = migrate()
+    print(f"Added columns: {', '.join(added)}" if added else f"{TABLE} is already up to date")
+
+if __name__ == "__main__":
+    main()